@@ -9,167 +9,32 @@ JavaScript for visualizing node graphs with animated GIFs.
 import json
 import base64
 import argparse
+import os
 import sys
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import add, itemgetter
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from string import Template
+from typing import BinaryIO, Dict, Iterator, List, Set, Tuple, Optional
 
 
-class CanvasConverter:
-    """Converts JSON Canvas to standalone HTML"""
+# Worker threads reading and encoding assets ahead of the HTML writer
+PREFETCH_WORKERS = 4
 
-    PRESET_COLORS = {
-        "1": "#e06c75",  # Red
-        "2": "#d19a66",  # Orange
-        "3": "#e5c07b",  # Yellow
-        "4": "#98c379",  # Green
-        "5": "#61afef",  # Blue
-        "6": "#c678dd",  # Purple
-    }
+# Most source bytes of assets queued ahead of the writer at once. Larger
+# assets are not prefetched and are streamed chunk by chunk instead.
+PREFETCH_BYTES = 16 * 1024 * 1024
 
-    def __init__(self, canvas_path: Path, root_dir: Optional[Path] = None):
-        self.canvas_path = canvas_path
-        self.canvas_dir = canvas_path.parent
-        self.root_dir = root_dir
-        self.canvas_data = None
-        self.nodes = []
-        self.edges = []
-
-    def load_canvas(self) -> bool:
-        """Load and parse the JSON canvas file"""
-        try:
-            with open(self.canvas_path, 'r', encoding='utf-8') as f:
-                self.canvas_data = json.load(f)
+# Output file buffer, so streamed fragments reach the disk in large writes
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
-            self.nodes = self.canvas_data.get('nodes', [])
-            self.edges = self.canvas_data.get('edges', [])
-            return True
-        except Exception as e:
-            print(f"Error loading canvas file: {e}", file=sys.stderr)
-            return False
+# Bytes read per base64 chunk; a multiple of 3 so no padding is emitted mid-stream
+B64_CHUNK_SIZE = 57 * 1024
 
-    def resolve_file_path(self, file_path: str) -> Optional[Path]:
-        """Resolve file path from canvas reference to actual file location"""
-        # Try original path
-        original = Path(file_path)
-        if original.is_absolute() and original.exists():
-            return original
-
-        # Try relative to root directory if provided
-        if self.root_dir:
-            relative_to_root = self.root_dir / file_path
-            if relative_to_root.exists():
-                return relative_to_root
-
-        # Try relative to canvas directory
-        relative = self.canvas_dir / file_path
-        if relative.exists():
-            return relative
-
-        # Try just the basename in root directory if provided
-        basename = Path(file_path).name
-        if self.root_dir:
-            in_root_dir = self.root_dir / basename
-            if in_root_dir.exists():
-                return in_root_dir
-
-            # Search recursively in root directory
-            for found_file in self.root_dir.rglob(basename):
-                return found_file
-
-        # Try just the basename in canvas directory
-        in_canvas_dir = self.canvas_dir / basename
-        if in_canvas_dir.exists():
-            return in_canvas_dir
-
-        # Search recursively in canvas directory
-        for found_file in self.canvas_dir.rglob(basename):
-            return found_file
-
-        return None
-
-    def file_to_data_url(self, file_path: str) -> str:
-        """Convert file to base64 data URL"""
-        resolved_path = self.resolve_file_path(file_path)
-
-        if resolved_path is None:
-            print(f"Warning: Could not find file: {file_path}", file=sys.stderr)
-            return ""
-
-        try:
-            with open(resolved_path, 'rb') as f:
-                data = f.read()
-
-            # Determine MIME type
-            suffix = resolved_path.suffix.lower()
-            mime_types = {
-                '.gif': 'image/gif',
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.svg': 'image/svg+xml',
-            }
-            mime_type = mime_types.get(suffix, 'application/octet-stream')
-
-            # Encode to base64
-            b64_data = base64.b64encode(data).decode('ascii')
-            return f"data:{mime_type};base64,{b64_data}"
-
-        except Exception as e:
-            print(f"Error reading file {resolved_path}: {e}", file=sys.stderr)
-            return ""
-
-    def get_color(self, color_value: Optional[str]) -> str:
-        """Convert color value to CSS color"""
-        if not color_value:
-            return ""
-
-        # Check if it's a preset color
-        if color_value in self.PRESET_COLORS:
-            return self.PRESET_COLORS[color_value]
-
-        # Return as-is (assume hex color)
-        return color_value
-
-    def calculate_bounds(self) -> Tuple[int, int, int, int]:
-        """Calculate bounding box for all nodes"""
-        if not self.nodes:
-            return 0, 0, 800, 600
-
-        min_x = min(node['x'] for node in self.nodes)
-        min_y = min(node['y'] for node in self.nodes)
-        max_x = max(node['x'] + node['width'] for node in self.nodes)
-        max_y = max(node['y'] + node['height'] for node in self.nodes)
-
-        # Add padding
-        padding = 50
-        min_x -= padding
-        min_y -= padding
-        max_x += padding
-        max_y += padding
-
-        return min_x, min_y, max_x - min_x, max_y - min_y
-
-    def generate_html(self) -> str:
-        """Generate standalone HTML"""
-        min_x, min_y, width, height = self.calculate_bounds()
-
-        # Generate nodes HTML
-        nodes_html = []
-        for node in self.nodes:
-            node_html = self.generate_node_html(node, min_x, min_y)
-            nodes_html.append(node_html)
-
-        # Generate edges data for JavaScript
-        edges_data = json.dumps(self.edges)
-        nodes_data = json.dumps([{
-            'id': node['id'],
-            'x': node['x'] - min_x,
-            'y': node['y'] - min_y,
-            'width': node['width'],
-            'height': node['height'],
-        } for node in self.nodes])
-
-        html = f"""<!DOCTYPE html>
+# HTML template pieces, written around the streamed nodes HTML and JSON data.
+# HEAD and TAIL only substitute $width and $height; literal "$" is written "$$".
+HEAD = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -177,20 +42,20 @@ class CanvasConverter:
     <meta name="apple-mobile-web-app-capable" content="yes">
     <title>Canvas Visualization</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             background-color: #1e1e1e;
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             overflow: hidden;
             color: #abb2bf;
-        }}
+        }
 
-        #viewport {{
+        #viewport {
             width: 100vw;
             height: 100vh;
             overflow: hidden;
@@ -199,63 +64,63 @@ class CanvasConverter:
             touch-action: none;
             -webkit-user-select: none;
             user-select: none;
-        }}
+        }
 
-        #viewport.grabbing {{
+        #viewport.grabbing {
             cursor: grabbing;
-        }}
+        }
 
-        #canvas-container {{
+        #canvas-container {
             position: relative;
-            width: {width}px;
-            height: {height}px;
+            width: ${width}px;
+            height: ${height}px;
             transform-origin: 0 0;
             transition: transform 0.1s ease-out;
-        }}
+        }
 
-        #edges-layer {{
+        #edges-layer {
             position: absolute;
             top: 0;
             left: 0;
             width: 100%;
             height: 100%;
             pointer-events: none;
-        }}
+        }
 
-        #nodes-layer {{
+        #nodes-layer {
             position: relative;
             width: 100%;
             height: 100%;
-        }}
+        }
 
-        .node {{
+        .node {
             position: absolute;
             border-radius: 8px;
             overflow: hidden;
-        }}
+        }
 
-        .node-text {{
+        .node-text {
             background-color: #282c34;
             border: 1px solid #3e4451;
             padding: 12px;
             color: #abb2bf;
             font-size: 14px;
             line-height: 1.5;
-        }}
+        }
 
-        .node-file {{
+        .node-file {
             background-color: #282c34;
             border: 1px solid #3e4451;
-        }}
+        }
 
-        .node-file img {{
+        .node-file img {
             width: 100%;
             height: 100%;
             object-fit: cover;
             display: block;
-        }}
+        }
 
-        .node-link {{
+        .node-link {
             background-color: #282c34;
             border: 1px solid #3e4451;
             padding: 12px;
@@ -264,24 +129,24 @@ class CanvasConverter:
             display: flex;
             align-items: center;
             justify-content: center;
-        }}
+        }
 
-        .node-group {{
+        .node-group {
             background-color: rgba(40, 44, 52, 0.5);
             border: 1px solid #3e4451;
-        }}
+        }
 
-        .edge {{
+        .edge {
             fill: none;
             stroke: #abb2bf;
             stroke-width: 2;
-        }}
+        }
 
-        .edge-arrow {{
+        .edge-arrow {
             fill: #abb2bf;
-        }}
+        }
 
-        #controls {{
+        #controls {
             position: fixed;
             top: 20px;
             right: 20px;
@@ -293,9 +158,9 @@ class CanvasConverter:
             display: flex;
             flex-direction: column;
             gap: 8px;
-        }}
+        }
 
-        .control-btn {{
+        .control-btn {
             background-color: #3e4451;
             border: none;
             color: #abb2bf;
@@ -304,24 +169,24 @@ class CanvasConverter:
             cursor: pointer;
             font-size: 14px;
             transition: background-color 0.2s;
-        }}
+        }
 
-        .control-btn:hover {{
+        .control-btn:hover {
             background-color: #4e5461;
-        }}
+        }
 
-        .control-btn:active {{
+        .control-btn:active {
             background-color: #2e3441;
-        }}
+        }
 
-        #zoom-level {{
+        #zoom-level {
             text-align: center;
             color: #61afef;
             font-size: 12px;
             padding: 4px;
-        }}
+        }
 
-        #instructions {{
+        #instructions {
             position: fixed;
             bottom: 20px;
             left: 20px;
@@ -332,56 +197,56 @@ class CanvasConverter:
             font-size: 12px;
             color: #abb2bf;
             z-index: 1000;
-        }}
+        }
 
-        #instructions div {{
+        #instructions div {
             margin: 4px 0;
-        }}
+        }
 
         /* Mobile optimizations */
-        @media (max-width: 768px) {{
-            #controls {{
+        @media (max-width: 768px) {
+            #controls {
                 top: 10px;
                 right: 10px;
                 padding: 8px;
                 gap: 6px;
-            }}
+            }
 
-            .control-btn {{
+            .control-btn {
                 padding: 10px 14px;
                 font-size: 13px;
                 min-height: 44px;
-            }}
+            }
 
-            #instructions {{
+            #instructions {
                 bottom: 10px;
                 left: 10px;
                 padding: 8px;
                 font-size: 11px;
                 max-width: calc(100vw - 20px);
-            }}
+            }
 
-            #zoom-level {{
+            #zoom-level {
                 font-size: 11px;
-            }}
-        }}
+            }
+        }
 
-        @media (max-width: 480px) {{
-            #instructions {{
+        @media (max-width: 480px) {
+            #instructions {
                 font-size: 10px;
                 padding: 6px;
-            }}
+            }
 
-            #controls {{
+            #controls {
                 padding: 6px;
                 gap: 4px;
-            }}
+            }
 
-            .control-btn {{
+            .control-btn {
                 padding: 8px 12px;
                 font-size: 12px;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -409,52 +274,55 @@ class CanvasConverter:
                 </defs>
             </svg>
             <div id="nodes-layer">
-                {''.join(nodes_html)}
+                """)
+
+MID = b"""
             </div>
         </div>
     </div>
 
     <script>
         // Nodes and edges data
-        const nodes = {nodes_data};
-        const edges = {edges_data};
+        const nodes = """
+
+TAIL = Template(""";
 
         // Create a map of node ID to node data
-        const nodeMap = {{}};
-        nodes.forEach(node => {{
+        const nodeMap = {};
+        nodes.forEach(node => {
             nodeMap[node.id] = node;
-        }});
+        });
 
         // Calculate connection point based on side
-        function getConnectionPoint(node, side) {{
+        function getConnectionPoint(node, side) {
             const x = node.x;
             const y = node.y;
             const w = node.width;
             const h = node.height;
 
-            switch (side) {{
+            switch (side) {
                 case 'top':
-                    return {{ x: x + w / 2, y: y }};
+                    return { x: x + w / 2, y: y };
                 case 'right':
-                    return {{ x: x + w, y: y + h / 2 }};
+                    return { x: x + w, y: y + h / 2 };
                 case 'bottom':
-                    return {{ x: x + w / 2, y: y + h }};
+                    return { x: x + w / 2, y: y + h };
                 case 'left':
-                    return {{ x: x, y: y + h / 2 }};
+                    return { x: x, y: y + h / 2 };
                 default:
-                    return {{ x: x + w / 2, y: y + h / 2 }};
-            }}
-        }}
+                    return { x: x + w / 2, y: y + h / 2 };
+            }
+        }
 
         // Generate SVG path for edge with Bezier curve
-        function generateEdgePath(edge) {{
+        function generateEdgePath(edge) {
             const fromNode = nodeMap[edge.fromNode];
             const toNode = nodeMap[edge.toNode];
 
-            if (!fromNode || !toNode) {{
+            if (!fromNode || !toNode) {
                 console.warn('Missing node for edge:', edge);
                 return '';
-            }}
+            }
 
             const fromSide = edge.fromSide || 'right';
             const toSide = edge.toSide || 'left';
@@ -472,7 +340,7 @@ class CanvasConverter:
 
             const offset = Math.min(distance / 2, 100);
 
-            switch (fromSide) {{
+            switch (fromSide) {
                 case 'top':
                     cp1x = start.x;
                     cp1y = start.y - offset;
@@ -489,9 +357,9 @@ class CanvasConverter:
                     cp1x = start.x - offset;
                     cp1y = start.y;
                     break;
-            }}
+            }
 
-            switch (toSide) {{
+            switch (toSide) {
                 case 'top':
                     cp2x = end.x;
                     cp2y = end.y - offset;
@@ -508,27 +376,27 @@ class CanvasConverter:
                     cp2x = end.x - offset;
                     cp2y = end.y;
                     break;
-            }}
+            }
 
             // Create cubic Bezier curve
-            return `M ${{start.x}},${{start.y}} C ${{cp1x}},${{cp1y}} ${{cp2x}},${{cp2y}} ${{end.x}},${{end.y}}`;
-        }}
+            return `M $${start.x},$${start.y} C $${cp1x},$${cp1y} $${cp2x},$${cp2y} $${end.x},$${end.y}`;
+        }
 
         // Render edges
         const svg = document.getElementById('edges-layer');
-        edges.forEach(edge => {{
+        edges.forEach(edge => {
             const path = document.createElementNS('http://www.w3.org/2000/svg', 'path');
             path.setAttribute('d', generateEdgePath(edge));
             path.setAttribute('class', 'edge');
 
             // Add arrow marker if needed
             const toEnd = edge.toEnd || 'arrow';
-            if (toEnd === 'arrow') {{
+            if (toEnd === 'arrow') {
                 path.setAttribute('marker-end', 'url(#arrowhead)');
-            }}
+            }
 
             svg.appendChild(path);
-        }});
+        });
 
         // Zoom and Pan functionality
         const viewport = document.getElementById('viewport');
@@ -546,92 +414,92 @@ class CanvasConverter:
         const MAX_SCALE = 5;
         const ZOOM_STEP = 0.1;
 
-        function updateTransform() {{
-            container.style.transform = `translate(${{translateX}}px, ${{translateY}}px) scale(${{scale}})`;
-            zoomLevelDisplay.textContent = `${{Math.round(scale * 100)}}%`;
-        }}
+        function updateTransform() {
+            container.style.transform = `translate($${translateX}px, $${translateY}px) scale($${scale})`;
+            zoomLevelDisplay.textContent = `$${Math.round(scale * 100)}%`;
+        }
 
-        function zoom(delta, centerX = null, centerY = null) {{
+        function zoom(delta, centerX = null, centerY = null) {
             const oldScale = scale;
             scale = Math.max(MIN_SCALE, Math.min(MAX_SCALE, scale + delta));
 
             // Zoom towards mouse position if provided
-            if (centerX !== null && centerY !== null) {{
+            if (centerX !== null && centerY !== null) {
                 const scaleRatio = scale / oldScale;
                 translateX = centerX - (centerX - translateX) * scaleRatio;
                 translateY = centerY - (centerY - translateY) * scaleRatio;
-            }}
+            }
 
             updateTransform();
-        }}
+        }
 
-        function resetView() {{
+        function resetView() {
             scale = 1;
             const viewportWidth = window.innerWidth;
             const viewportHeight = window.innerHeight;
-            const canvasWidth = {width};
-            const canvasHeight = {height};
+            const canvasWidth = $width;
+            const canvasHeight = $height;
             translateX = (viewportWidth - canvasWidth) / 2;
             translateY = (viewportHeight - canvasHeight) / 2;
             updateTransform();
-        }}
+        }
 
         // Mouse wheel zoom
-        viewport.addEventListener('wheel', (e) => {{
+        viewport.addEventListener('wheel', (e) => {
             e.preventDefault();
             const delta = e.deltaY > 0 ? -ZOOM_STEP : ZOOM_STEP;
             const rect = viewport.getBoundingClientRect();
             const centerX = e.clientX - rect.left;
             const centerY = e.clientY - rect.top;
             zoom(delta, centerX, centerY);
-        }}, {{ passive: false }});
+        }, { passive: false });
 
         // Drag to pan
-        viewport.addEventListener('mousedown', (e) => {{
+        viewport.addEventListener('mousedown', (e) => {
             isDragging = true;
             startX = e.clientX - translateX;
             startY = e.clientY - translateY;
             viewport.classList.add('grabbing');
-        }});
+        });
 
-        document.addEventListener('mousemove', (e) => {{
+        document.addEventListener('mousemove', (e) => {
             if (!isDragging) return;
             translateX = e.clientX - startX;
             translateY = e.clientY - startY;
             updateTransform();
-        }});
+        });
 
-        document.addEventListener('mouseup', () => {{
+        document.addEventListener('mouseup', () => {
             isDragging = false;
             viewport.classList.remove('grabbing');
-        }});
+        });
 
         // Button controls
-        document.getElementById('zoom-in').addEventListener('click', () => {{
+        document.getElementById('zoom-in').addEventListener('click', () => {
             zoom(ZOOM_STEP);
-        }});
+        });
 
-        document.getElementById('zoom-out').addEventListener('click', () => {{
+        document.getElementById('zoom-out').addEventListener('click', () => {
             zoom(-ZOOM_STEP);
-        }});
+        });
 
-        document.getElementById('zoom-reset').addEventListener('click', () => {{
+        document.getElementById('zoom-reset').addEventListener('click', () => {
             resetView();
-        }});
+        });
 
         // Keyboard controls
-        document.addEventListener('keydown', (e) => {{
-            if (e.key === '+' || e.key === '=') {{
+        document.addEventListener('keydown', (e) => {
+            if (e.key === '+' || e.key === '=') {
                 e.preventDefault();
                 zoom(ZOOM_STEP);
-            }} else if (e.key === '-' || e.key === '_') {{
+            } else if (e.key === '-' || e.key === '_') {
                 e.preventDefault();
                 zoom(-ZOOM_STEP);
-            }} else if (e.key === '0') {{
+            } else if (e.key === '0') {
                 e.preventDefault();
                 resetView();
-            }}
-        }});
+            }
+        });
 
         // Mobile touch support
         let lastTouchDistance = 0;
@@ -639,41 +507,41 @@ class CanvasConverter:
         let touchStartY = 0;
         let isTouching = false;
 
-        function getTouchDistance(touches) {{
+        function getTouchDistance(touches) {
             const dx = touches[0].clientX - touches[1].clientX;
             const dy = touches[0].clientY - touches[1].clientY;
             return Math.sqrt(dx * dx + dy * dy);
-        }}
+        }
 
-        function getTouchCenter(touches) {{
-            return {{
+        function getTouchCenter(touches) {
+            return {
                 x: (touches[0].clientX + touches[1].clientX) / 2,
                 y: (touches[0].clientY + touches[1].clientY) / 2
-            }};
-        }}
+            };
+        }
 
-        viewport.addEventListener('touchstart', (e) => {{
-            if (e.touches.length === 1) {{
+        viewport.addEventListener('touchstart', (e) => {
+            if (e.touches.length === 1) {
                 // Single touch - panning
                 isTouching = true;
                 touchStartX = e.touches[0].clientX - translateX;
                 touchStartY = e.touches[0].clientY - translateY;
                 viewport.classList.add('grabbing');
-            }} else if (e.touches.length === 2) {{
+            } else if (e.touches.length === 2) {
                 // Two touches - pinch to zoom
                 e.preventDefault();
                 lastTouchDistance = getTouchDistance(e.touches);
-            }}
-        }}, {{ passive: false }});
+            }
+        }, { passive: false });
 
-        viewport.addEventListener('touchmove', (e) => {{
-            if (e.touches.length === 1 && isTouching) {{
+        viewport.addEventListener('touchmove', (e) => {
+            if (e.touches.length === 1 && isTouching) {
                 // Single touch - panning
                 e.preventDefault();
                 translateX = e.touches[0].clientX - touchStartX;
                 translateY = e.touches[0].clientY - touchStartY;
                 updateTransform();
-            }} else if (e.touches.length === 2) {{
+            } else if (e.touches.length === 2) {
                 // Two touches - pinch to zoom
                 e.preventDefault();
                 const newDistance = getTouchDistance(e.touches);
@@ -688,95 +556,544 @@ class CanvasConverter:
 
                 zoom(zoomDelta, centerX, centerY);
                 lastTouchDistance = newDistance;
-            }}
-        }}, {{ passive: false }});
+            }
+        }, { passive: false });
 
-        viewport.addEventListener('touchend', (e) => {{
-            if (e.touches.length === 0) {{
+        viewport.addEventListener('touchend', (e) => {
+            if (e.touches.length === 0) {
                 isTouching = false;
                 viewport.classList.remove('grabbing');
-            }} else if (e.touches.length === 1) {{
+            } else if (e.touches.length === 1) {
                 // Reset for single touch after pinch
                 touchStartX = e.touches[0].clientX - translateX;
                 touchStartY = e.touches[0].clientY - translateY;
                 lastTouchDistance = 0;
-            }}
-        }}, {{ passive: false }});
+            }
+        }, { passive: false });
 
         // Initialize view centered
-        function centerCanvas() {{
+        function centerCanvas() {
             const viewportWidth = window.innerWidth;
             const viewportHeight = window.innerHeight;
-            const canvasWidth = {width};
-            const canvasHeight = {height};
+            const canvasWidth = $width;
+            const canvasHeight = $height;
 
             // Center the canvas in the viewport
             translateX = (viewportWidth - canvasWidth) / 2;
             translateY = (viewportHeight - canvasHeight) / 2;
 
             updateTransform();
-        }}
+        }
 
         centerCanvas();
     </script>
 </body>
-</html>"""
+</html>""")
+
+
+# Single-pass escaping of text node content
+_TEXT_HTML_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    '\n': '<br>',
+})
+
+# Edge fields read by the page script, plus the id so its "Missing node for
+# edge" warning still identifies the edge; everything else is left out
+_EDGE_FIELDS = ('id', 'fromNode', 'toNode', 'fromSide', 'toSide', 'toEnd')
+
+# Pre-encoded data URL prefixes by lowercase file suffix
+_DATA_URL_HEADERS = {
+    suffix: f"data:{mime_type};base64,".encode('ascii')
+    for suffix, mime_type in {
+        '.gif': 'image/gif',
+        '.png': 'image/png',
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.svg': 'image/svg+xml',
+    }.items()
+}
+_DEFAULT_DATA_URL_HEADER = b"data:application/octet-stream;base64,"
+
+# Bound format method for node position styles
+_STYLE_FMT = "left: {}px; top: {}px; width: {}px; height: {}px;".format
+
+
+def _exists(path: str) -> bool:
+    """Check whether a path exists with a single stat call"""
+    try:
+        os.stat(path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _walk_files(root: str) -> Iterator[Tuple[str, str]]:
+    """Yield (name, path) for every file under root, shallowest first"""
+    # DirEntry carries the file type from the directory read itself, so
+    # unlike Path.rglob() no extra stat or Path object is needed per entry
+    pending = deque([root])
+    while pending:
+        directory = pending.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.name, entry.path
+        except OSError:
+            continue
+
+
+def _data_url_header(suffix: str) -> bytes:
+    """Data URL prefix, including the MIME type, for a file suffix"""
+    header = _DATA_URL_HEADERS.get(suffix)
+    if header is None:
+        header = _DATA_URL_HEADERS.get(suffix.lower(), _DEFAULT_DATA_URL_HEADER)
+    return header
+
+
+def _iter_base64(f: BinaryIO) -> Iterator[bytes]:
+    """Yield the base64 encoding of an open file, one chunk at a time"""
+    while True:
+        chunk = f.read(B64_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield base64.b64encode(chunk)
+
+
+def _encode_data_url(resolved_path: Path) -> bytes:
+    """Read and encode a whole file as a data URL (runs on prefetch threads)"""
+    parts = [_data_url_header(resolved_path.suffix)]
+    with open(resolved_path, 'rb') as f:
+        parts.extend(_iter_base64(f))
+    return b''.join(parts)
+
+
+class _AssetPrefetcher:
+    """Encodes assets on worker threads ahead of the HTML writer
+
+    Assets are queued in the order their nodes are written, keeping at most
+    PREFETCH_BYTES of source data in flight at once.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, assets: List[Tuple[str, Path, int]]):
+        self._executor = executor
+        self._queue = deque(assets)
+        self._futures: Dict[str, Tuple[Future, int]] = {}
+        self._queued_bytes = 0
+        self._fill()
+
+    def _fill(self) -> None:
+        """Submit queued assets until the byte budget is used up"""
+        queue = self._queue
+        while queue and self._queued_bytes + queue[0][2] <= PREFETCH_BYTES:
+            key, resolved_path, size = queue.popleft()
+            self._futures[key] = (self._executor.submit(_encode_data_url, resolved_path), size)
+            self._queued_bytes += size
+
+    def take(self, key: str) -> Optional[Future]:
+        """Hand over the pending encode of an asset, if it was prefetched"""
+        item = self._futures.pop(key, None)
+        if item is None:
+            return None
+
+        future, size = item
+        self._queued_bytes -= size
+        self._fill()
+        return future
+
+    def cancel(self) -> None:
+        """Drop every encode that has not been taken yet"""
+        for future, _ in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._queue.clear()
 
-        return html
 
-    def generate_node_html(self, node: Dict, offset_x: int, offset_y: int) -> str:
-        """Generate HTML for a single node"""
-        node_id = node['id']
-        node_type = node['type']
-        x = node['x'] - offset_x
-        y = node['y'] - offset_y
-        width = node['width']
-        height = node['height']
-        color = self.get_color(node.get('color'))
+class CanvasConverter:
+    """Converts JSON Canvas to standalone HTML"""
 
-        style = f"left: {x}px; top: {y}px; width: {width}px; height: {height}px;"
-        if color:
-            style += f" border-color: {color};"
+    PRESET_COLORS = {
+        "1": "#e06c75",  # Red
+        "2": "#d19a66",  # Orange
+        "3": "#e5c07b",  # Yellow
+        "4": "#98c379",  # Green
+        "5": "#61afef",  # Blue
+        "6": "#c678dd",  # Purple
+    }
+
+    def __init__(self, canvas_path: Path, root_dir: Optional[Path] = None):
+        self.canvas_path = canvas_path
+        self.canvas_dir = canvas_path.parent
+        self.root_dir = root_dir
+        self.canvas_data = None
+        self.nodes = []
+        self.edges = []
+        self._canvas_dir_s = str(self.canvas_dir)
+        self._root_dir_s = str(root_dir) if root_dir else None
+        self._resolve_cache: Dict[str, Optional[Path]] = {}
+        self._rglob_index: Dict[str, Dict[str, str]] = {}
+        self._asset_keys: Dict[Path, str] = {}
+        self._data_url_cache: Dict[str, bytes] = {}
+        self._shared_assets: Set[str] = set()
+        self._failed_assets: Set[str] = set()
+        self._node_writers = {
+            'text': self._write_text_node,
+            'file': self._write_file_node,
+            'link': self._write_link_node,
+            'group': self._write_group_node,
+        }
+
+    def load_canvas(self) -> bool:
+        """Load and parse the JSON canvas file"""
+        try:
+            # Hand raw bytes to the C scanner in one go; json.loads detects
+            # the encoding itself, including a UTF-8 BOM
+            with open(self.canvas_path, 'rb') as f:
+                self.canvas_data = json.loads(f.read())
+
+            self.nodes = self.canvas_data.get('nodes', [])
+            self.edges = self.canvas_data.get('edges', [])
+            return True
+        except Exception as e:
+            print(f"Error loading canvas file: {e}", file=sys.stderr)
+            return False
+
+    def resolve_file_path(self, file_path: str) -> Optional[Path]:
+        """Resolve file path from canvas reference to actual file location"""
+        if file_path in self._resolve_cache:
+            return self._resolve_cache[file_path]
+
+        found = self._find_file(file_path)
+        resolved_path = Path(found) if found is not None else None
+        self._resolve_cache[file_path] = resolved_path
+        return resolved_path
+
+    def _find_file(self, file_path: str) -> Optional[str]:
+        """Try each lookup strategy in order for a canvas file reference"""
+        # Try original path
+        if os.path.isabs(file_path) and _exists(file_path):
+            return file_path
+
+        # Try relative to root directory if provided
+        if self._root_dir_s:
+            relative_to_root = os.path.join(self._root_dir_s, file_path)
+            if _exists(relative_to_root):
+                return relative_to_root
+
+        # Try relative to canvas directory
+        relative = os.path.join(self._canvas_dir_s, file_path)
+        if _exists(relative):
+            return relative
+
+        # Try just the basename in root directory if provided
+        basename = os.path.basename(file_path)
+        if self._root_dir_s:
+            in_root_dir = os.path.join(self._root_dir_s, basename)
+            if _exists(in_root_dir):
+                return in_root_dir
+
+            # Search recursively in root directory
+            found_file = self._find_in_tree(self._root_dir_s, basename)
+            if found_file is not None:
+                return found_file
+
+        # Try just the basename in canvas directory
+        in_canvas_dir = os.path.join(self._canvas_dir_s, basename)
+        if _exists(in_canvas_dir):
+            return in_canvas_dir
+
+        # Search recursively in canvas directory
+        return self._find_in_tree(self._canvas_dir_s, basename)
+
+    def _find_in_tree(self, directory: str, basename: str) -> Optional[str]:
+        """Find a file by basename anywhere under directory"""
+        # Walk each directory once and index its files by basename. Key on
+        # the absolute path so a root directory that is also the canvas
+        # directory (e.g. "--root-dir .") is only walked once.
+        key = os.path.abspath(directory)
+        index = self._rglob_index.get(key)
+        if index is None:
+            index = {}
+            for filename, path in _walk_files(directory):
+                index.setdefault(filename, path)
+            self._rglob_index[key] = index
+
+        return index.get(basename)
+
+    def _asset_key(self, resolved_path: Path) -> str:
+        """Canonical path identifying an asset, computed once per resolved path"""
+        key = self._asset_keys.get(resolved_path)
+        if key is None:
+            key = self._asset_keys[resolved_path] = os.path.realpath(resolved_path)
+        return key
+
+    def write_file_data_url(self, resolved_path: Path, fp: BinaryIO,
+                            prefix: bytes = b'', suffix: bytes = b'',
+                            prefetched: Optional[Future] = None) -> bool:
+        """Stream file to output as a base64 data URL, between prefix and suffix
+
+        prefetched is a pending _encode_data_url() of the same file, if any.
+        Returns False, having written nothing, if the file cannot be read.
+        """
+        # Reuse the outcome for an asset already written for another node
+        key = self._asset_key(resolved_path)
+        if key in self._failed_assets:
+            return False
+        data_url = self._data_url_cache.get(key)
+
+        if data_url is None and prefetched is not None:
+            try:
+                data_url = prefetched.result()
+            except OSError as e:
+                print(f"Error reading file {resolved_path}: {e}", file=sys.stderr)
+                self._failed_assets.add(key)
+                return False
+            if key in self._shared_assets:
+                self._data_url_cache[key] = data_url
+
+        if data_url is not None:
+            fp.write(prefix)
+            fp.write(data_url)
+            fp.write(suffix)
+            return True
+
+        # Open the file before writing any markup so a missing or unreadable
+        # asset can still fall back to the not-found node
+        try:
+            f = open(resolved_path, 'rb')
+        except OSError as e:
+            print(f"Error reading file {resolved_path}: {e}", file=sys.stderr)
+            self._failed_assets.add(key)
+            return False
+
+        # Only keep the encoded data in memory for assets used by several nodes
+        parts = [] if key in self._shared_assets else None
+
+        # Remember where the markup starts so a read that fails part way
+        # through can be rolled back, leaving nothing written
+        start = fp.tell()
+
+        with f:
+            fp.write(prefix)
+            header = _data_url_header(resolved_path.suffix)
+            fp.write(header)
+            if parts is not None:
+                parts.append(header)
+
+            # Encode to base64 one chunk at a time
+            try:
+                for encoded in _iter_base64(f):
+                    fp.write(encoded)
+                    if parts is not None:
+                        parts.append(encoded)
+            except OSError as e:
+                print(f"Error reading file {resolved_path}: {e}", file=sys.stderr)
+                fp.seek(start)
+                fp.truncate()
+                self._failed_assets.add(key)
+                return False
+
+        fp.write(suffix)
+        if parts is not None:
+            self._data_url_cache[key] = b''.join(parts)
+        return True
+
+    def get_color(self, color_value: Optional[str]) -> str:
+        """Convert color value to CSS color"""
+        if not color_value:
+            return ""
+
+        # Check if it's a preset color
+        if color_value in self.PRESET_COLORS:
+            return self.PRESET_COLORS[color_value]
+
+        # Return as-is (assume hex color)
+        return color_value
+
+    def calculate_bounds(self) -> Tuple[int, int, int, int]:
+        """Calculate bounding box for all nodes"""
+        if not self.nodes:
+            return 0, 0, 800, 600
 
-        if node_type == 'text':
-            text = node.get('text', '')
-            # Basic Markdown-like rendering (simple newline to <br>)
-            text_html = text.replace('\n', '<br>')
-            return f'<div class="node node-text" style="{style}">{text_html}</div>'
+        # Pull each column out with C-level map/itemgetter instead of
+        # four Python generator passes over the nodes
+        xs = list(map(itemgetter('x'), self.nodes))
+        ys = list(map(itemgetter('y'), self.nodes))
+        min_x = min(xs)
+        min_y = min(ys)
+        max_x = max(map(add, xs, map(itemgetter('width'), self.nodes)))
+        max_y = max(map(add, ys, map(itemgetter('height'), self.nodes)))
 
-        elif node_type == 'file':
-            file_path = node.get('file', '')
-            data_url = self.file_to_data_url(file_path)
-            if data_url:
-                return f'<div class="node node-file" style="{style}"><img src="{data_url}" alt="{file_path}"></div>'
-            else:
-                return f'<div class="node node-text" style="{style}">File not found: {file_path}</div>'
+        # Add padding
+        padding = 50
+        min_x -= padding
+        min_y -= padding
+        max_x += padding
+        max_y += padding
 
-        elif node_type == 'link':
-            url = node.get('url', '')
-            return f'<a href="{url}" class="node node-link" style="{style}" target="_blank">{url}</a>'
+        return min_x, min_y, max_x - min_x, max_y - min_y
 
-        elif node_type == 'group':
-            label = node.get('label', '')
-            return f'<div class="node node-group" style="{style}"><div>{label}</div></div>'
+    def write_html(self, fp: BinaryIO) -> None:
+        """Stream standalone HTML to a file opened in binary mode"""
+        min_x, min_y, width, height = self.calculate_bounds()
 
-        return ''
+        # Collect assets in the order their nodes are written, and find those
+        # referenced by more than one node so they are only encoded once
+        assets = {}
+        asset_counts = Counter()
+        for node in self.nodes:
+            if node['type'] != 'file':
+                continue
+            resolved_path = self.resolve_file_path(node.get('file', ''))
+            if resolved_path is not None:
+                key = self._asset_key(resolved_path)
+                assets.setdefault(key, resolved_path)
+                asset_counts[key] += 1
+        self._shared_assets = {key for key, count in asset_counts.items() if count > 1}
+
+        # Read and encode small assets on worker threads while nodes are
+        # written. Assets that are larger than PREFETCH_BYTES, or cannot be
+        # stat'ed, are streamed in place.
+        prefetch = []
+        for key, resolved_path in assets.items():
+            try:
+                size = os.stat(resolved_path).st_size
+            except OSError:
+                continue
+            if size <= PREFETCH_BYTES:
+                prefetch.append((key, resolved_path, size))
+
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            prefetcher = _AssetPrefetcher(executor, prefetch)
+            try:
+                self._write_document(fp, min_x, min_y, width, height, prefetcher)
+            finally:
+                prefetcher.cancel()
+
+    def _write_document(self, fp: BinaryIO, min_x: int, min_y: int, width: int, height: int,
+                        prefetcher: _AssetPrefetcher) -> None:
+        """Write the page itself once bounds and assets are known"""
+        fp.write(HEAD.substitute(width=width, height=height).encode('utf-8'))
+
+        # Write nodes HTML and collect their JSON for the script in the same
+        # pass, shifting each node into canvas coordinates only once.
+        # json.dumps() goes through the C encoder, json.dump() does not.
+        dumps = json.dumps
+        write_node_html = self.write_node_html
+        nodes_data = []
+        for node in self.nodes:
+            x = node['x'] - min_x
+            y = node['y'] - min_y
+            write_node_html(node, x, y, fp, prefetcher)
+            nodes_data.append(dumps({
+                'id': node['id'],
+                'x': x,
+                'y': y,
+                'width': node['width'],
+                'height': node['height'],
+            }))
+
+        fp.write(MID)
+
+        # Write nodes and edges data for JavaScript
+        fp.write(b'[')
+        fp.write(', '.join(nodes_data).encode('utf-8'))
+        fp.write(b'];\n        const edges = [')
+        for i, edge in enumerate(self.edges):
+            if i:
+                fp.write(b', ')
+            fp.write(dumps({
+                field: edge[field] for field in _EDGE_FIELDS if field in edge
+            }).encode('utf-8'))
+        fp.write(b']')
+
+        fp.write(TAIL.substitute(width=width, height=height).encode('utf-8'))
+
+    def write_node_html(self, node: Dict, x: int, y: int, fp: BinaryIO,
+                        prefetcher: Optional[_AssetPrefetcher] = None) -> None:
+        """Write HTML for a single node at canvas position (x, y)"""
+        writer = self._node_writers.get(node['type'])
+        if writer is None:
+            return
+
+        style = _STYLE_FMT(x, y, node['width'], node['height'])
+        color = node.get('color')
+        if color:
+            style += f" border-color: {self.get_color(color)};"
+
+        writer(node, style, fp, prefetcher)
+
+    def _write_text_node(self, node: Dict, style: str, fp: BinaryIO,
+                         prefetcher: Optional[_AssetPrefetcher]) -> None:
+        """Write a text node"""
+        text = node.get('text', '')
+        # Escape HTML special characters and turn newlines into <br>
+        text_html = text.translate(_TEXT_HTML_TABLE)
+        fp.write(f'<div class="node node-text" style="{style}">{text_html}</div>'.encode('utf-8'))
+
+    def _write_file_node(self, node: Dict, style: str, fp: BinaryIO,
+                         prefetcher: Optional[_AssetPrefetcher]) -> None:
+        """Write a file node with its embedded asset"""
+        file_path = node.get('file', '')
+        resolved_path = self.resolve_file_path(file_path)
+        if resolved_path is None:
+            print(f"Warning: Could not find file: {file_path}", file=sys.stderr)
+        elif self.write_file_data_url(
+            resolved_path, fp,
+            prefix=f'<div class="node node-file" style="{style}"><img src="'.encode('utf-8'),
+            suffix=f'" alt="{file_path}"></div>'.encode('utf-8'),
+            prefetched=prefetcher.take(self._asset_key(resolved_path)) if prefetcher else None,
+        ):
+            return
+
+        fp.write(f'<div class="node node-text" style="{style}">File not found: {file_path}</div>'.encode('utf-8'))
+
+    def _write_link_node(self, node: Dict, style: str, fp: BinaryIO,
+                         prefetcher: Optional[_AssetPrefetcher]) -> None:
+        """Write a link node"""
+        url = node.get('url', '')
+        fp.write(f'<a href="{url}" class="node node-link" style="{style}" target="_blank">{url}</a>'.encode('utf-8'))
+
+    def _write_group_node(self, node: Dict, style: str, fp: BinaryIO,
+                          prefetcher: Optional[_AssetPrefetcher]) -> None:
+        """Write a group node"""
+        label = node.get('label', '')
+        fp.write(f'<div class="node node-group" style="{style}"><div>{label}</div></div>'.encode('utf-8'))
 
     def convert(self, output_path: Path) -> bool:
         """Main conversion method"""
         if not self.load_canvas():
             return False
 
-        html = self.generate_html()
+        # Check node geometry before touching the output file
+        try:
+            self.calculate_bounds()
+        except (KeyError, TypeError) as e:
+            print(f"Error in canvas file: invalid node position or size: {e}", file=sys.stderr)
+            return False
 
+        # Write to a temporary file next to the output and move it into place
+        # only once the page is complete, so a failure part way through
+        # leaves any previous output untouched
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f"Successfully converted to: {output_path}")
-            return True
-        except Exception as e:
+            with open(tmp_path, 'xb', buffering=OUTPUT_BUFFER_SIZE) as f:
+                self.write_html(f)
+            os.replace(tmp_path, output_path)
+        except OSError as e:
             print(f"Error writing output file: {e}", file=sys.stderr)
             return False
+        finally:
+            if _exists(tmp_path):
+                os.remove(tmp_path)
+
+        print(f"Successfully converted to: {output_path}")
+        return True
 
 
 def main():